@@ -3,17 +3,17 @@ from __future__ import annotations
 
 import logging
 import time
-from datetime import timedelta
-from typing import Any, Iterable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
 
+from .api import InvalidAuth, create_and_connect, normalize_host, release_session
 from .const import (
     DOMAIN,
+    DATA_PENDING_SESSIONS,
+    PENDING_SESSION_MAX_AGE,
     CONF_HOST,
     CONF_PANEL_ID,
     CONF_USER_CODE,
@@ -23,78 +23,53 @@ from .const import (
     CONF_PARTITION,
     CONF_NO_PIN_REQUIRED,
     CONF_EVENT_HOUR_OFFSET,
+    CONF_EVENT_TRIGGERED_REFRESH,
+    DEFAULT_EVENT_TRIGGERED_REFRESH,
 )
+from .coordinator import VisonicAlarmCoordinator
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.ALARM_CONTROL_PANEL, Platform.BINARY_SENSOR]
-SCAN_INTERVAL = timedelta(seconds=10)
 
-_DEVICES_REFRESH_SECONDS = 300  # var 5:e minut
-_last_devices_refresh = 0.0
 
-
-def _normalize_host(host: str) -> str:
-    host = (host or "").strip()
-    host = host.replace("https://", "").replace("http://", "").rstrip("/")
-    return host
-
-
-def _as_list(value: Any) -> list:
-    if value is None:
-        return []
-    if isinstance(value, list):
-        return value
-    if isinstance(value, tuple):
-        return list(value)
-    return []
+# entry.data keys the library session is built from; changing any of them needs a reload
+_CONNECTION_KEYS = (
+    CONF_HOST,
+    CONF_APP_ID,
+    CONF_USER_EMAIL,
+    CONF_USER_PASSWORD,
+    CONF_USER_CODE,
+    CONF_PANEL_ID,
+    CONF_PARTITION,
+)
 
 
-def _extract_devices(alarm: Any) -> list[Any]:
-    """
-    Best-effort extraction of devices/zones from different library versions.
-    We try several common attributes & methods.
-    """
-    # 1) Common attribute names seen across versions/integrations
-    for attr in ("contacts", "devices", "zones", "sensors"):
-        v = getattr(alarm, attr, None)
-        lst = _as_list(v)
-        if lst:
-            return lst
-
-    # 2) Common method names
-    for meth in ("get_devices", "get_zones", "get_contacts", "devices_list", "zones_list"):
-        fn = getattr(alarm, meth, None)
-        if callable(fn):
-            try:
-                v = fn()
-                lst = _as_list(v)
-                if lst:
-                    return lst
-            except Exception:
-                _LOGGER.debug("Device extraction via %s() failed (ignored)", meth, exc_info=True)
-
-    # 3) Some libs tuck devices inside status objects/dicts
-    status = getattr(alarm, "status", None)
-    if isinstance(status, dict):
-        for k in ("devices", "zones", "contacts"):
-            if k in status and isinstance(status[k], list) and status[k]:
-                return status[k]
-
-    return []
+def _entry_options(entry: ConfigEntry) -> tuple[bool, int, bool]:
+    """Return (no_pin_required, event_hour_offset, event_triggered_refresh), options first."""
+    no_pin_required = entry.options.get(
+        CONF_NO_PIN_REQUIRED, entry.data.get(CONF_NO_PIN_REQUIRED, False)
+    )
+    event_hour_offset = entry.options.get(
+        CONF_EVENT_HOUR_OFFSET, entry.data.get(CONF_EVENT_HOUR_OFFSET, 0)
+    )
+    event_triggered_refresh = entry.options.get(
+        CONF_EVENT_TRIGGERED_REFRESH, DEFAULT_EVENT_TRIGGERED_REFRESH
+    )
+    return no_pin_required, event_hour_offset, event_triggered_refresh
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the integration (YAML not used)."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Visonic Alarm from a config entry."""
-    from visonic import alarm as visonic_alarm
-
-    host = _normalize_host(str(entry.data.get(CONF_HOST, "")))
+    host = normalize_host(str(entry.data.get(CONF_HOST, "")))
     app_id = str(entry.data.get(CONF_APP_ID, "")).strip()
     user_email = str(entry.data.get(CONF_USER_EMAIL, "")).strip()
     user_password = str(entry.data.get(CONF_USER_PASSWORD, ""))
@@ -121,84 +96,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if missing:
         raise ConfigEntryNotReady(f"Missing required config values: {', '.join(missing)}")
 
-    no_pin_required = entry.options.get(
-        CONF_NO_PIN_REQUIRED, entry.data.get(CONF_NO_PIN_REQUIRED, False)
-    )
-    event_hour_offset = entry.options.get(
-        CONF_EVENT_HOUR_OFFSET, entry.data.get(CONF_EVENT_HOUR_OFFSET, 0)
-    )
+    no_pin_required, event_hour_offset, event_triggered_refresh = _entry_options(entry)
+
+    # The config flow already logged in and fetched devices; reuse that
+    # session on the first setup instead of logging in a second time.
+    pending = hass.data.get(DATA_PENDING_SESSIONS, {}).pop(entry.unique_id, None)
+    if pending and (time.monotonic() - pending["created"]) > PENDING_SESSION_MAX_AGE:
+        # Too old to trust; log it out rather than leaking the cloud session
+        await hass.async_add_executor_job(release_session, pending["alarm"])
+        pending = None
 
-    def _create_and_connect():
-        alarm = visonic_alarm.System(
+    if pending:
+        alarm = pending["alarm"]
+        _LOGGER.debug(
+            "Reusing Visonic Alarm session from config flow for %s (%d devices)",
             host,
-            app_id,
-            user_code,
-            user_email,
-            user_password,
-            panel_id,
-            partition,
+            len(pending["devices"]),
         )
-
-        alarm.connect()
-
-        # Populate device list early
+    else:
         try:
-            alarm.update_devices()
-        except Exception as dev_err:
-            _LOGGER.warning("Connected, but initial update_devices() failed: %s", dev_err)
-
-        return alarm
-
-    try:
-        alarm = await hass.async_add_executor_job(_create_and_connect)
-        _LOGGER.info("Visonic Alarm connected successfully to %s", host)
-    except Exception as err:
-        _LOGGER.error("Could not connect/login to Visonic Alarm: %s", err, exc_info=True)
-        raise ConfigEntryNotReady(f"Could not connect/login to Visonic Alarm: {err}") from err
-
-    async def async_update_data() -> dict[str, Any]:
-        """Fetch data from API."""
-        global _last_devices_refresh
-
-        try:
-            # status often changes frequently
-            await hass.async_add_executor_job(alarm.update_status)
-
-            # devices/zone list changes rarely → refresh less often
-            now = time.time()
-            if (now - _last_devices_refresh) >= _DEVICES_REFRESH_SECONDS:
-                _last_devices_refresh = now
-                try:
-                    await hass.async_add_executor_job(alarm.update_devices)
-                except Exception as dev_err:
-                    _LOGGER.debug("update_devices failed (ignored): %s", dev_err)
-
-            devices = _extract_devices(alarm)
-
-            # Helpful one-time-ish log if no devices found
-            if not devices:
-                _LOGGER.warning(
-                    "No devices/zones found yet. If this persists, we may need to map the correct "
-                    "attribute from the library. Alarm attrs sample: has contacts=%s devices=%s zones=%s",
-                    hasattr(alarm, "contacts"),
-                    hasattr(alarm, "devices"),
-                    hasattr(alarm, "zones"),
-                )
-
-            return {
-                "state": getattr(alarm, "state", None),
-                "status": getattr(alarm, "status", None),
-                "devices": devices,
-            }
+            alarm, _devices = await hass.async_add_executor_job(
+                create_and_connect,
+                host,
+                app_id,
+                user_code,
+                user_email,
+                user_password,
+                panel_id,
+                partition,
+            )
+            _LOGGER.info("Visonic Alarm connected successfully to %s", host)
+        except InvalidAuth as err:
+            # Retrying will not fix bad credentials; don't hammer the cloud.
+            raise ConfigEntryError(f"Invalid Visonic Alarm credentials: {err}") from err
         except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+            _LOGGER.error("Could not connect/login to Visonic Alarm: %s", err, exc_info=True)
+            raise ConfigEntryNotReady(f"Could not connect/login to Visonic Alarm: {err}") from err
 
-    coordinator = DataUpdateCoordinator(
+    coordinator = VisonicAlarmCoordinator(
         hass,
-        _LOGGER,
-        name=f"{DOMAIN}_{entry.entry_id}",
-        update_method=async_update_data,
-        update_interval=SCAN_INTERVAL,
+        entry,
+        alarm,
+        event_triggered=event_triggered_refresh,
     )
 
     await coordinator.async_config_entry_first_refresh()
@@ -206,7 +145,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "alarm": alarm,
-        "config": entry.data,
+        "config": dict(entry.data),
         "options": entry.options,
         "no_pin_required": no_pin_required,
         "event_hour_offset": event_hour_offset,
@@ -222,10 +161,35 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data is not None:
+            await hass.async_add_executor_job(release_session, data["alarm"])
     return unload_ok
 
 
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update.
+
+    Options are applied to the running coordinator and entities; only a
+    change to the connection parameters needs a reload (and a new login).
+    """
+    data = hass.data[DOMAIN].get(entry.entry_id)
+    if data is None or any(
+        entry.data.get(key) != data["config"].get(key) for key in _CONNECTION_KEYS
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    no_pin_required, event_hour_offset, event_triggered_refresh = _entry_options(entry)
+    data["config"] = dict(entry.data)
+    data["options"] = entry.options
+    data["no_pin_required"] = no_pin_required
+    data["event_hour_offset"] = event_hour_offset
+
+    coordinator: VisonicAlarmCoordinator = data["coordinator"]
+    if coordinator.event_triggered != event_triggered_refresh:
+        coordinator.event_triggered = event_triggered_refresh
+        await coordinator.async_request_full_refresh()
+
+    # Let entities re-read options (e.g. code_format) and write their state
+    coordinator.async_update_listeners()
@@ -15,7 +15,13 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, CONF_USER_CODE, CONF_NO_PIN_REQUIRED
+from .const import (
+    DOMAIN,
+    CONF_USER_CODE,
+    CONF_NO_PIN_REQUIRED,
+    CONF_FORCE_ARM,
+    DEFAULT_FORCE_ARM,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -75,22 +81,23 @@ class VisonicAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
         self._entry = entry
         self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_alarm_panel"
         
-        # Läs konfiguration och options
+        # Läs konfiguration (options läses live, se _no_pin_required)
         self._user_code = str(entry.data.get(CONF_USER_CODE, ""))
-        
+
+    @property
+    def _no_pin_required(self) -> bool:
+        """Options can change at runtime without a reload, so read them live."""
         # Kolla options först, sedan data
-        self._no_pin_required = entry.options.get(
+        return self._entry.options.get(
             CONF_NO_PIN_REQUIRED,
-            entry.data.get(CONF_NO_PIN_REQUIRED, False)
+            self._entry.data.get(CONF_NO_PIN_REQUIRED, False)
         )
-        
-        # Sätt code format baserat på no_pin_required
-        self._attr_code_format = None if self._no_pin_required else "number"
 
     @property
     def code_format(self):
         """Return the code format."""
-        return self._attr_code_format
+        # Sätt code format baserat på no_pin_required
+        return None if self._no_pin_required else "number"
 
     @property
     def code_arm_required(self) -> bool:
@@ -115,6 +122,14 @@ class VisonicAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
 
         return _map_state(raw_state)
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Expose readiness and the zones that currently block arming."""
+        return {
+            "ready": self.coordinator.panel_ready,
+            "open_zones": sorted(self.coordinator.open_zones.values()),
+        }
+
     def _validate_code(self, code: str | None, action: str) -> bool:
         """Validate the provided code."""
         # Om PIN inte krävs, godkänn alltid
@@ -150,18 +165,32 @@ class VisonicAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
         
         return True
 
+    def _check_ready(self) -> bool:
+        """Reject arming locally when zones are open, without a cloud round trip."""
+        if self._entry.options.get(CONF_FORCE_ARM, DEFAULT_FORCE_ARM):
+            return True
+
+        blockers = self.coordinator.arm_blockers()
+        if blockers is None:
+            return True
+
+        if blockers:
+            message = "The alarm is not ready to arm. Open zones: " + ", ".join(blockers)
+        else:
+            message = "The alarm panel reports that it is not ready to arm."
+        pn.create(self.hass, message, title="Arm Failed")
+        return False
+
     async def _call_alarm(self, method_name: str, code: str | None, action: str) -> None:
         """Call a blocking alarm method safely via executor and refresh."""
         # Validera PIN-kod först
         if not self._validate_code(code, action):
             return
-        
-        method = getattr(self._alarm, method_name, None)
-        if not callable(method):
-            raise ValueError(f"Alarm method not supported by library: {method_name}")
 
-        await self.hass.async_add_executor_job(method)
-        await self.coordinator.async_request_refresh()
+        if action == "arm" and not self._check_ready():
+            return
+        
+        await self.coordinator.async_send_command(method_name)
 
     async def async_alarm_disarm(self, code: str | None = None) -> None:
         """Send disarm command."""
@@ -177,16 +206,4 @@ class VisonicAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
 
     async def async_alarm_arm_night(self, code: str | None = None) -> None:
         """Send arm night command (fallback to home if not supported)."""
-        # Validera PIN-kod först
-        if not self._validate_code(code, "arm"):
-            return
-        
-        if callable(getattr(self._alarm, "arm_night", None)):
-            method = getattr(self._alarm, "arm_night")
-            await self.hass.async_add_executor_job(method)
-        else:
-            _LOGGER.warning("arm_night not supported; falling back to arm_home")
-            method = getattr(self._alarm, "arm_home")
-            await self.hass.async_add_executor_job(method)
-        
-        await self.coordinator.async_request_refresh()
+        await self._call_alarm("arm_night", code, "arm")
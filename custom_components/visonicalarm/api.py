@@ -0,0 +1,200 @@
+"""Helpers around the blocking Visonic library session."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Library exceptions that mean the cloud rejected the credentials. Anything
+# else (including unknown errors) is treated as "cannot connect" so the
+# entry keeps retrying instead of failing for good.
+_AUTH_ERROR_NAMES = frozenset(
+    {
+        "UnauthorizedError",
+        "InvalidUserCodeError",
+        "InvalidCredentialsError",
+        "WrongUsernameOrPasswordError",
+    }
+)
+_AUTH_HTTP_STATUSES = frozenset({401, 403})
+
+
+class CannotConnect(Exception):
+    """Error to indicate we cannot reach the alarm cloud."""
+
+
+class InvalidAuth(Exception):
+    """Error to indicate the cloud rejected the credentials."""
+
+
+def normalize_host(host: str) -> str:
+    host = (host or "").strip()
+    host = host.replace("https://", "").replace("http://", "").rstrip("/")
+    return host
+
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, tuple):
+        return list(value)
+    return []
+
+
+def extract_devices(alarm: Any) -> list[Any]:
+    """
+    Best-effort extraction of devices/zones from different library versions.
+    We try several common attributes & methods.
+    """
+    # 1) Common attribute names seen across versions/integrations
+    for attr in ("contacts", "devices", "zones", "sensors"):
+        v = getattr(alarm, attr, None)
+        lst = _as_list(v)
+        if lst:
+            return lst
+
+    # 2) Common method names
+    for meth in ("get_devices", "get_zones", "get_contacts", "devices_list", "zones_list"):
+        fn = getattr(alarm, meth, None)
+        if callable(fn):
+            try:
+                v = fn()
+                lst = _as_list(v)
+                if lst:
+                    return lst
+            except Exception:
+                _LOGGER.debug("Device extraction via %s() failed (ignored)", meth, exc_info=True)
+
+    # 3) Some libs tuck devices inside status objects/dicts
+    status = getattr(alarm, "status", None)
+    if isinstance(status, dict):
+        for k in ("devices", "zones", "contacts"):
+            if k in status and isinstance(status[k], list) and status[k]:
+                return status[k]
+
+    return []
+
+
+_fingerprint_warned = False
+
+
+def _payload_default(obj: Any) -> Any:
+    # Library device objects keep their data in (name-mangled) instance attributes
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return repr(obj)
+
+
+def payload_fingerprint(*payloads: Any) -> str:
+    """Return a stable hash of raw API payloads, used to detect unchanged polls.
+
+    Blocking-ish (serializes every device); call it from the executor.
+    """
+    global _fingerprint_warned
+
+    try:
+        raw = json.dumps(payloads, sort_keys=True, default=_payload_default)
+    except (TypeError, ValueError) as err:
+        # Unserializable payload: return a one-off value so the poll is
+        # always treated as changed rather than silently dropped.
+        if not _fingerprint_warned:
+            _fingerprint_warned = True
+            _LOGGER.warning(
+                "Could not fingerprint Visonic payload (%s); every poll will be treated "
+                "as changed",
+                err,
+            )
+        return os.urandom(16).hex()
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def read_change_indicator(alarm: Any) -> str | None:
+    """Return a cheap fingerprint of the newest panel event (blocking).
+
+    Returns None when the library offers no such indicator, in which case
+    callers should poll full status instead.
+    """
+    fn = getattr(alarm, "get_last_event", None)
+    if not callable(fn):
+        return None
+    return payload_fingerprint(fn())
+
+
+def release_session(alarm: Any) -> None:
+    """Log out and drop the library session (blocking, best effort)."""
+    for meth in ("logout", "disconnect", "close"):
+        fn = getattr(alarm, meth, None)
+        if callable(fn):
+            try:
+                fn()
+            except Exception:
+                _LOGGER.debug("Releasing session via %s() failed (ignored)", meth, exc_info=True)
+            return
+
+
+def _http_status(err: BaseException) -> int | None:
+    response = getattr(err, "response", None)
+    status = getattr(response, "status_code", None) or getattr(err, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_auth_error(err: BaseException) -> bool:
+    """True only for a real credentials rejection (HTTP 401/403 or a known auth exception)."""
+    seen: set[int] = set()
+    current: BaseException | None = err
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if type(current).__name__ in _AUTH_ERROR_NAMES:
+            return True
+        if _http_status(current) in _AUTH_HTTP_STATUSES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def create_and_connect(
+    host: str,
+    app_id: str,
+    user_code: str,
+    user_email: str,
+    user_password: str,
+    panel_id: str,
+    partition: str,
+) -> tuple[Any, list[Any]]:
+    """Log in to the panel and fetch the device list (blocking).
+
+    Returns the connected library session together with the devices found.
+    Raises InvalidAuth or CannotConnect so callers can surface real errors.
+    """
+    from visonic import alarm as visonic_alarm
+
+    alarm = visonic_alarm.System(
+        host,
+        app_id,
+        user_code,
+        user_email,
+        user_password,
+        panel_id,
+        partition,
+    )
+
+    try:
+        alarm.connect()
+    except Exception as err:
+        if _is_auth_error(err):
+            raise InvalidAuth(str(err)) from err
+        raise CannotConnect(str(err)) from err
+
+    # Populate device list early
+    try:
+        alarm.update_devices()
+    except Exception as dev_err:
+        _LOGGER.warning("Connected, but initial update_devices() failed: %s", dev_err)
+
+    return alarm, extract_devices(alarm)
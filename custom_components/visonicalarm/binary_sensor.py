@@ -12,157 +12,33 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .zones import (
+    device_class_from_subtype,
+    device_number,
+    device_type,
+    get_field,
+    zone_id,
+    zone_is_on,
+    zone_key,
+    zone_name,
+    zone_subtype,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-# Exact subtype sets seen in your system (plus safe extras)
-OPENING_SUBTYPES = {
-    "CONTACT",
-    "CONTACT_AUX",
-    "MC303_VANISH",
-    "DOOR",
-    "WINDOW",
-    "MAGNET",
-    "REED",
-}
-MOTION_SUBTYPES = {
-    "MOTION",
-    "FLAT_PIR_SMART",
-    "PIR",
-    "PIR_SMART",
-    "CURTAIN_PIR",
-    "MOTION_DETECTOR",
-}
-SMOKE_SUBTYPES = {
-    "SMOKE",
-    "SMOKE_DETECTOR",
-    "FIRE",
-    "HEAT",
-    "CO",
+# Attribute names for the in-memory zone history, per device class
+_HISTORY_ATTRS = {
+    BinarySensorDeviceClass.OPENING: ("last_opened", "last_closed", "open_count_today"),
+    BinarySensorDeviceClass.MOTION: ("last_motion", "last_cleared", "motion_count_today"),
+    BinarySensorDeviceClass.SMOKE: ("last_triggered", "last_cleared", "trigger_count_today"),
 }
 
 
-def _get(obj: Any, *keys: str, default=None):
-    if isinstance(obj, dict):
-        for k in keys:
-            if k in obj and obj[k] is not None:
-                return obj[k]
-    for k in keys:
-        if hasattr(obj, k):
-            v = getattr(obj, k)
-            if v is not None:
-                return v
-    return default
-
-
-def _device_type(obj: Any) -> str:
-    t = _get(obj, "device_type", "type", "_Device__device_type", default="")
-    return str(t).strip().upper() if t is not None else ""
-
-
-def _zone_id(zone: Any) -> str:
-    return str(_get(zone, "id", "zone_id", "device_id", "_Device__id", default=""))
-
-
-def _device_number(zone: Any) -> str:
-    dn = _get(zone, "device_number", "_Device__device_number", "number", default=None)
-    return "" if dn is None else str(dn)
-
-
-def _zone_name(zone: Any) -> str:
-    name = _get(zone, "name", "label", "_Device__name", default="")
-    name = str(name).strip() if name is not None else ""
-    zid = _zone_id(zone) or "unknown"
-    return name if name else f"Zone {zid}"
-
-
-def _zone_subtype(zone: Any) -> str:
-    st = _get(zone, "subtype", "_Device__subtype", default="")
-    return str(st).strip().upper() if st is not None else ""
-
-
-def _truthy(v: Any) -> bool | None:
-    if v is None:
-        return None
-    if isinstance(v, bool):
-        return v
-    if isinstance(v, (int, float)):
-        return bool(v)
-    if isinstance(v, str):
-        s = v.strip().lower()
-        if s in ("1", "true", "on", "open", "opened", "alarm", "triggered", "detected", "fault"):
-            return True
-        if s in ("0", "false", "off", "closed", "clear", "ok", "ready", "normal"):
-            return False
-    return None
-
-
-def _parse_warnings(w: Any) -> dict[str, Any]:
-    if w is None:
-        return {}
-    if isinstance(w, dict):
-        return w
-    if isinstance(w, list):
-        out: dict[str, Any] = {}
-        for item in w:
-            if isinstance(item, dict):
-                out.update(item)
-            elif isinstance(item, str):
-                out[item] = True
-        return out
-    if isinstance(w, str):
-        return {w: True}
-    return {"repr": repr(w)}
-
-
-def _zone_is_on(zone: Any) -> bool | None:
-    for key in ("open", "is_open", "isOpen", "triggered", "is_triggered", "alarm", "fault"):
-        v = _truthy(_get(zone, key, default=None))
-        if v is not None:
-            return v
-
-    v = _truthy(_get(zone, "state", "status", default=None))
-    if v is not None:
-        return v
-
-    warnings = _parse_warnings(_get(zone, "warnings", "_Device__warnings", default=None))
-    for k in ("open", "opened", "alarm", "triggered", "detected", "fault", "tamper"):
-        if k in warnings:
-            vv = _truthy(warnings.get(k))
-            return True if vv is None else vv
-
-    return None
-
-
-def _device_class_from_subtype(subtype: str) -> BinarySensorDeviceClass:
-    """
-    STRICT mapping with correct precedence:
-    CONTACT must NEVER end up as SMOKE.
-    """
-    st = (subtype or "").strip().upper()
-
-    # 1) Opening/contact first (your case)
-    if st in OPENING_SUBTYPES:
-        return BinarySensorDeviceClass.OPENING
-    if "CONTACT" in st or "VANISH" in st or "DOOR" in st or "WINDOW" in st:
-        return BinarySensorDeviceClass.OPENING
-
-    # 2) Motion
-    if st in MOTION_SUBTYPES:
-        return BinarySensorDeviceClass.MOTION
-    if "PIR" in st or "MOTION" in st:
-        return BinarySensorDeviceClass.MOTION
-
-    # 3) Smoke/fire
-    if st in SMOKE_SUBTYPES:
-        return BinarySensorDeviceClass.SMOKE
-    if "SMOKE" in st or "FIRE" in st or "HEAT" in st or st == "CO":
-        return BinarySensorDeviceClass.SMOKE
-
-    # Default
-    return BinarySensorDeviceClass.OPENING
+def _iso(ts: float | None) -> str | None:
+    return None if ts is None else dt_util.utc_from_timestamp(ts).isoformat()
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
@@ -170,7 +46,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     coordinator = data["coordinator"]
 
     devices = (coordinator.data or {}).get("devices", []) or []
-    zones = [d for d in devices if _device_type(d) == "ZONE"]
+    zones = [d for d in devices if device_type(d) == "ZONE"]
 
     if not zones:
         _LOGGER.warning("No ZONE devices found; binary sensors will not be created.")
@@ -186,21 +62,18 @@ class VisonicZoneBinarySensor(CoordinatorEntity, BinarySensorEntity):
     def __init__(self, coordinator, zone: Any) -> None:
         super().__init__(coordinator)
 
-        zid = _zone_id(zone) or "unknown"
-        dnum = _device_number(zone)
-        st = _zone_subtype(zone) or "UNKNOWN"
-
-        unique_tail = f"{zid}_{st}"
-        if dnum not in ("", "None", "null"):
-            unique_tail = f"{unique_tail}_{dnum}"
+        zid = zone_id(zone) or "unknown"
+        dnum = device_number(zone)
+        st = zone_subtype(zone) or "UNKNOWN"
 
         self._zone_id = zid
         self._device_number = dnum
         self._subtype = st
+        self._zone_key = zone_key(zone)
 
-        self._attr_unique_id = f"{DOMAIN}_zone_{unique_tail}"
-        self._attr_name = _zone_name(zone)
-        self._attr_device_class = _device_class_from_subtype(st)
+        self._attr_unique_id = f"{DOMAIN}_zone_{self._zone_key}"
+        self._attr_name = zone_name(zone)
+        self._attr_device_class = device_class_from_subtype(st)
 
         _LOGGER.debug(
             "Zone created: id=%s subtype=%s device_class=%s",
@@ -213,34 +86,55 @@ class VisonicZoneBinarySensor(CoordinatorEntity, BinarySensorEntity):
     def is_on(self) -> bool | None:
         devices = (self.coordinator.data or {}).get("devices", []) or []
         for z in devices:
-            if _device_type(z) != "ZONE":
+            if device_type(z) != "ZONE":
                 continue
-            if _zone_id(z) != self._zone_id:
+            if zone_id(z) != self._zone_id:
                 continue
-            if _zone_subtype(z) and _zone_subtype(z) != self._subtype:
+            if zone_subtype(z) and zone_subtype(z) != self._subtype:
                 continue
-            if self._device_number and _device_number(z) and _device_number(z) != self._device_number:
+            if self._device_number and device_number(z) and device_number(z) != self._device_number:
                 continue
-            return _zone_is_on(z)
+            return zone_is_on(z)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         devices = (self.coordinator.data or {}).get("devices", []) or []
         for z in devices:
-            if _device_type(z) != "ZONE":
+            if device_type(z) != "ZONE":
                 continue
-            if _zone_id(z) != self._zone_id:
+            if zone_id(z) != self._zone_id:
                 continue
-            if _zone_subtype(z) and _zone_subtype(z) != self._subtype:
+            if zone_subtype(z) and zone_subtype(z) != self._subtype:
                 continue
-            if self._device_number and _device_number(z) and _device_number(z) != self._device_number:
+            if self._device_number and device_number(z) and device_number(z) != self._device_number:
                 continue
             return {
-                "subtype": _zone_subtype(z),
-                "device_type": _device_type(z),
-                "device_number": _device_number(z) or None,
-                "warnings": _get(z, "warnings", "_Device__warnings", default=None),
-                "zone_group": _get(z, "zone", "_Device__zone", default=None),
+                "subtype": zone_subtype(z),
+                "device_type": device_type(z),
+                "device_number": device_number(z) or None,
+                "warnings": get_field(z, "warnings", "_Device__warnings", default=None),
+                "zone_group": get_field(z, "zone", "_Device__zone", default=None),
+                **self._history_attributes(),
             }
         return {}
+
+    def _history_attributes(self) -> dict[str, Any]:
+        """Derived activity values from the coordinator's in-memory zone history.
+
+        Zone states come from the device list, which is only fetched every
+        5 minutes (or when the panel logs an event in event-triggered mode).
+        Timestamps are therefore the time the change was seen, not when it
+        happened, and open/close cycles between two fetches are not counted.
+        """
+        last_on_attr, last_off_attr, count_attr = _HISTORY_ATTRS.get(
+            self._attr_device_class, _HISTORY_ATTRS[BinarySensorDeviceClass.OPENING]
+        )
+        history = self.coordinator.zone_history.get(self._zone_key)
+        if history is None:
+            return {last_on_attr: None, last_off_attr: None, count_attr: 0}
+        return {
+            last_on_attr: _iso(history.last_on),
+            last_off_attr: _iso(history.last_off),
+            count_attr: history.on_count_today(dt_util.start_of_local_day().timestamp()),
+        }
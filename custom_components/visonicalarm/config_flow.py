@@ -1,11 +1,16 @@
 """Config flow for Visonic Alarm integration."""
 import logging
+import time
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.data_entry_flow import AbortFlow
 
+from .api import CannotConnect, InvalidAuth, create_and_connect, normalize_host
 from .const import (
     DOMAIN,
+    DATA_PENDING_SESSIONS,
     CONF_HOST,
     CONF_PANEL_ID,
     CONF_USER_CODE,
@@ -15,17 +20,15 @@ from .const import (
     CONF_PARTITION,
     CONF_NO_PIN_REQUIRED,
     CONF_EVENT_HOUR_OFFSET,
+    CONF_EVENT_TRIGGERED_REFRESH,
+    DEFAULT_EVENT_TRIGGERED_REFRESH,
+    CONF_FORCE_ARM,
+    DEFAULT_FORCE_ARM,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _normalize_host(host: str) -> str:
-    host = host.strip()
-    host = host.replace("https://", "").replace("http://", "").rstrip("/")
-    return host
-
-
 def _digits_only(value: str) -> str:
     value = value.strip()
     if not value.isdigit():
@@ -45,13 +48,31 @@ class VisonicAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 # Normalize values to match how YAML commonly behaved
-                user_input[CONF_HOST] = _normalize_host(user_input[CONF_HOST])
+                user_input[CONF_HOST] = normalize_host(user_input[CONF_HOST])
                 user_input[CONF_PANEL_ID] = _digits_only(user_input[CONF_PANEL_ID])
                 user_input[CONF_USER_CODE] = _digits_only(user_input[CONF_USER_CODE])
 
                 await self.async_set_unique_id(str(user_input[CONF_PANEL_ID]))
                 self._abort_if_unique_id_configured()
 
+                # Log in once here so bad credentials show up in the form,
+                # then hand the session to async_setup_entry.
+                alarm, devices = await self.hass.async_add_executor_job(
+                    create_and_connect,
+                    user_input[CONF_HOST],
+                    str(user_input[CONF_APP_ID]).strip(),
+                    user_input[CONF_USER_CODE],
+                    str(user_input[CONF_USER_EMAIL]).strip(),
+                    str(user_input[CONF_USER_PASSWORD]),
+                    user_input[CONF_PANEL_ID],
+                    str(user_input.get(CONF_PARTITION, "-1")).strip(),
+                )
+                self.hass.data.setdefault(DATA_PENDING_SESSIONS, {})[self.unique_id] = {
+                    "alarm": alarm,
+                    "devices": devices,
+                    "created": time.monotonic(),
+                }
+
                 return self.async_create_entry(
                     title=f"Visonic Alarm {user_input[CONF_PANEL_ID]}",
                     data=user_input,
@@ -59,6 +80,12 @@ class VisonicAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except vol.Invalid:
                 # Specific field errors: show a general error for now
                 errors["base"] = "invalid_input"
+            except AbortFlow:
+                raise
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
             except Exception as err:
                 _LOGGER.error("Failed to create Visonic Alarm entry: %s", err)
                 errors["base"] = "cannot_connect"
@@ -116,6 +143,20 @@ class VisonicAlarmOptionsFlow(config_entries.OptionsFlow):
                         self.config_entry.data.get(CONF_EVENT_HOUR_OFFSET, 0),
                     ),
                 ): int,
+                vol.Optional(
+                    CONF_EVENT_TRIGGERED_REFRESH,
+                    default=self.config_entry.options.get(
+                        CONF_EVENT_TRIGGERED_REFRESH,
+                        DEFAULT_EVENT_TRIGGERED_REFRESH,
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_FORCE_ARM,
+                    default=self.config_entry.options.get(
+                        CONF_FORCE_ARM,
+                        DEFAULT_FORCE_ARM,
+                    ),
+                ): bool,
             }
         )
 
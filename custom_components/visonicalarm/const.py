@@ -12,8 +12,16 @@ CONF_USER_PASSWORD = 'user_password'
 CONF_PARTITION = 'partition'
 CONF_NO_PIN_REQUIRED = 'no_pin_required'
 CONF_EVENT_HOUR_OFFSET = 'event_hour_offset'
+CONF_EVENT_TRIGGERED_REFRESH = 'event_triggered_refresh'
+CONF_FORCE_ARM = 'force_arm'
 
 # Defaults
 DEFAULT_PARTITION = -1
 DEFAULT_NO_PIN_REQUIRED = False
 DEFAULT_EVENT_HOUR_OFFSET = 0
+DEFAULT_EVENT_TRIGGERED_REFRESH = False
+DEFAULT_FORCE_ARM = False
+
+# hass.data key for sessions handed from the config flow to setup
+DATA_PENDING_SESSIONS = f'{DOMAIN}_pending_sessions'
+PENDING_SESSION_MAX_AGE = 120  # seconds
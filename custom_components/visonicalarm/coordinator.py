@@ -0,0 +1,297 @@
+"""Data update coordinator for Visonic Alarm."""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import extract_devices, payload_fingerprint, read_change_indicator
+from .const import DOMAIN
+from .zones import (
+    HISTORY_MAX_ZONES,
+    ZoneHistory,
+    device_class_from_subtype,
+    device_type,
+    get_field,
+    truthy,
+    zone_is_on,
+    zone_key,
+    zone_name,
+    zone_subtype,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=10)
+
+_DEVICES_REFRESH_SECONDS = 300  # var 5:e minut
+_FULL_RESYNC_SECONDS = 300  # safety net when only the change indicator is polled
+# How old status/devices may be for a local arm rejection to be trusted
+_READY_MAX_AGE_SECONDS = 2 * SCAN_INTERVAL.total_seconds()
+
+
+class VisonicAlarmCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Poll the panel and keep the latest snapshot.
+
+    With event_triggered enabled, each poll first reads a cheap change
+    indicator (the newest panel event) and only fetches full status and
+    devices when it moves, or when the periodic full resync is due.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        alarm: Any,
+        event_triggered: bool = False,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.entry_id}",
+            update_interval=SCAN_INTERVAL,
+            always_update=False,
+        )
+        self.alarm = alarm
+        self.event_triggered = event_triggered
+
+        # The session is created with a fresh device list (see create_and_connect)
+        self._last_devices_refresh = time.monotonic()
+        self._last_full_refresh = 0.0
+        self._last_indicator: str | None = None
+        self._indicator_supported = True
+        self._force_full_refresh = False
+        # monotonic times of the last successful status / device fetch
+        self._status_fetched_at = 0.0
+        self._devices_fetched_at = self._last_devices_refresh
+
+        # Latest normalized on/off state per zone key, and its transition history
+        self.zone_states: dict[str, bool | None] = {}
+        self.zone_history: dict[str, ZoneHistory] = {}
+        # Zones that would block arming (open/faulted, motion excluded): key -> name
+        self.open_zones: dict[str, str] = {}
+
+    @property
+    def panel_ready(self) -> bool | None:
+        """The panel's own ready-to-arm flag from the latest status, if reported."""
+        status = (self.data or {}).get("status")
+        for source in (status, self.alarm):
+            ready = truthy(get_field(source, "ready", "is_ready", "isReady", default=None))
+            if ready is not None:
+                return ready
+        if isinstance(status, dict):
+            # Newer API versions report readiness per partition
+            flags = [
+                truthy(get_field(part, "ready", "is_ready", default=None))
+                for part in status.get("partitions") or []
+            ]
+            flags = [f for f in flags if f is not None]
+            if flags:
+                return all(flags)
+        return None
+
+    def arm_blockers(self) -> list[str] | None:
+        """Names of open zones if the panel reports not ready, else None.
+
+        Uses the latest status and zone index only; no cloud round trip. A
+        reject is only trusted when status was fetched within the last two
+        polls; otherwise (or without a ready flag) the command goes through
+        and the panel decides. Zone names are only listed when the device
+        list is equally fresh, since it can lag the status by minutes.
+        """
+        now = time.monotonic()
+        if now - self._status_fetched_at > _READY_MAX_AGE_SECONDS:
+            return None
+        if self.panel_ready is not False:
+            return None
+        if now - self._devices_fetched_at > _READY_MAX_AGE_SECONDS:
+            return []
+        return sorted(self.open_zones.values())
+
+    async def async_send_command(self, method_name: str, refresh: bool = True) -> None:
+        """Run a blocking arm/disarm method on the session, then refresh.
+
+        arm_night falls back to arm_home when the library lacks it. Pass
+        refresh=False to request the refresh separately (see services).
+        """
+        method = getattr(self.alarm, method_name, None)
+        if not callable(method) and method_name == "arm_night":
+            _LOGGER.warning("arm_night not supported; falling back to arm_home")
+            method = getattr(self.alarm, "arm_home", None)
+        if not callable(method):
+            raise ValueError(f"Alarm method not supported by library: {method_name}")
+
+        await self.hass.async_add_executor_job(method)
+        if refresh:
+            await self.async_request_full_refresh()
+
+    async def async_request_full_refresh(self) -> None:
+        """Request a refresh that bypasses the change indicator (e.g. after a command)."""
+        self._force_full_refresh = True
+        await self.async_request_refresh()
+
+    def _record_zone_transitions(self, devices: list[Any]) -> None:
+        """Diff zone states against the previous poll and log transitions.
+
+        The zone index and open_zones are rebuilt from the zones in this poll
+        (capped at HISTORY_MAX_ZONES), so zones that disappear are dropped
+        along with their history.
+        """
+        now = dt_util.utcnow().timestamp()
+        zone_states: dict[str, bool | None] = {}
+        open_zones: dict[str, str] = {}
+
+        for zone in devices:
+            if device_type(zone) != "ZONE":
+                continue
+            key = zone_key(zone)
+            if key not in zone_states and len(zone_states) >= HISTORY_MAX_ZONES:
+                continue
+            is_on = zone_is_on(zone)
+            first_seen = key not in self.zone_states
+            previous = self.zone_states.get(key)
+            zone_states[key] = is_on
+
+            if is_on and device_class_from_subtype(zone_subtype(zone)) != BinarySensorDeviceClass.MOTION:
+                open_zones[key] = zone_name(zone)
+
+            # The first poll is a baseline, not a transition
+            if first_seen or is_on is None or is_on == previous:
+                continue
+
+            history = self.zone_history.get(key)
+            if history is None:
+                history = self.zone_history[key] = ZoneHistory()
+            history.append(now, is_on)
+
+        # An empty device list is more likely a failed fetch than a panel
+        # without zones; keep the previous index in that case.
+        if not zone_states:
+            return
+        self.zone_states = zone_states
+        self.open_zones = open_zones
+        for key in self.zone_history.keys() - zone_states.keys():
+            del self.zone_history[key]
+
+    async def _async_indicator_moved(self) -> bool:
+        """Return True if the panel reports a change since the last poll."""
+        indicator = await self.hass.async_add_executor_job(read_change_indicator, self.alarm)
+        if indicator is None:
+            if self._indicator_supported:
+                _LOGGER.debug("No change indicator available; falling back to full polling")
+            self._indicator_supported = False
+            return True
+
+        # The first read only seeds the indicator: the session already holds a
+        # fresh device list, so it must not trigger another update_devices()
+        moved = self._last_indicator is not None and indicator != self._last_indicator
+        self._last_indicator = indicator
+        return moved
+
+    def _fetch_snapshot(self, refresh_devices: bool) -> tuple[Any, Any, list[Any], str, bool]:
+        """Fetch status (and devices) and fingerprint the result (blocking).
+
+        The last item tells whether the device list was refreshed.
+        """
+        alarm = self.alarm
+
+        # status often changes frequently
+        alarm.update_status()
+
+        devices_refreshed = False
+        if refresh_devices:
+            try:
+                alarm.update_devices()
+                devices_refreshed = True
+            except Exception as dev_err:
+                _LOGGER.debug("update_devices failed (ignored): %s", dev_err)
+
+        state = getattr(alarm, "state", None)
+        status = getattr(alarm, "status", None)
+        devices = extract_devices(alarm)
+        fingerprint = payload_fingerprint(state, status, devices)
+        return state, status, devices, fingerprint, devices_refreshed
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from API."""
+        alarm = self.alarm
+
+        try:
+            now = time.monotonic()
+            forced = self._force_full_refresh
+            moved = False
+            full = (
+                not self.event_triggered
+                or not self._indicator_supported
+                or forced
+                or self.data is None
+                or (now - self._last_full_refresh) >= _FULL_RESYNC_SECONDS
+            )
+            if self.event_triggered and self._indicator_supported:
+                # Always read it so the stored indicator matches the status we fetch
+                moved = await self._async_indicator_moved()
+                full = full or moved
+
+            if not full:
+                return self.data
+
+            self._force_full_refresh = False
+            self._last_full_refresh = now
+
+            # devices/zone list changes rarely → refresh less often, but zone
+            # states live in the device payload, so fetch it whenever the panel
+            # reported a change or a command forced a refresh
+            refresh_devices = (
+                forced or moved or (now - self._last_devices_refresh) >= _DEVICES_REFRESH_SECONDS
+            )
+            if refresh_devices:
+                self._last_devices_refresh = now
+
+            # Fetch and hash in one executor job; hashing serializes every device
+            (
+                state,
+                status,
+                devices,
+                fingerprint,
+                devices_refreshed,
+            ) = await self.hass.async_add_executor_job(self._fetch_snapshot, refresh_devices)
+            fetched_at = time.monotonic()
+            self._status_fetched_at = fetched_at
+            if devices_refreshed:
+                self._devices_fetched_at = fetched_at
+
+            # Most polls return exactly the same payload; reuse the previous
+            # snapshot so the coordinator (always_update=False) skips dispatch.
+            previous = self.data
+            if previous is not None and previous.get("fingerprint") == fingerprint:
+                return previous
+
+            # Helpful one-time-ish log if no devices found
+            if not devices:
+                _LOGGER.warning(
+                    "No devices/zones found yet. If this persists, we may need to map the correct "
+                    "attribute from the library. Alarm attrs sample: has contacts=%s devices=%s zones=%s",
+                    hasattr(alarm, "contacts"),
+                    hasattr(alarm, "devices"),
+                    hasattr(alarm, "zones"),
+                )
+
+            self._record_zone_transitions(devices)
+
+            return {
+                "state": state,
+                "status": status,
+                "devices": devices,
+                "fingerprint": fingerprint,
+            }
+        except Exception as err:
+            # The indicator may already have moved on; don't miss this change
+            self._force_full_refresh = True
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
@@ -0,0 +1,161 @@
+"""Services for Visonic Alarm: arm/disarm many panels at once."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    DOMAIN,
+    CONF_USER_CODE,
+    CONF_PARTITION,
+    CONF_FORCE_ARM,
+    DEFAULT_PARTITION,
+    DEFAULT_FORCE_ARM,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_ARM = "arm"
+SERVICE_DISARM = "disarm"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PARTITION = "partition"
+ATTR_MODE = "mode"
+ATTR_CODE = "code"
+ATTR_FORCE = "force"
+
+# Concurrent commands in flight; each one occupies an executor thread
+MAX_PARALLEL_COMMANDS = 4
+
+_ARM_METHODS = {
+    "away": "arm_away",
+    "home": "arm_home",
+    "night": "arm_night",
+}
+
+_TARGET_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_PARTITION): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_CODE): cv.string,
+}
+
+ARM_SCHEMA = vol.Schema(
+    {
+        **_TARGET_SCHEMA,
+        vol.Optional(ATTR_MODE, default="away"): vol.In(list(_ARM_METHODS)),
+        vol.Optional(ATTR_FORCE): cv.boolean,
+    }
+)
+DISARM_SCHEMA = vol.Schema(_TARGET_SCHEMA)
+
+
+def _select_targets(hass: HomeAssistant, call: ServiceCall) -> list[tuple[str, dict[str, Any]]]:
+    """Loaded entries matching the requested entry ids and partitions (all if none given)."""
+    entry_ids = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    partitions = call.data.get(ATTR_PARTITION)
+
+    targets = []
+    for entry_id, data in hass.data.get(DOMAIN, {}).items():
+        if entry_ids and entry_id not in entry_ids:
+            continue
+        partition = str(data["config"].get(CONF_PARTITION, DEFAULT_PARTITION)).strip()
+        if partitions and partition not in partitions:
+            continue
+        targets.append((entry_id, data))
+
+    if not targets:
+        raise ServiceValidationError("No loaded Visonic Alarm panels match the given targets")
+    return targets
+
+
+async def _async_run(
+    hass: HomeAssistant, call: ServiceCall, method_name: str
+) -> ServiceResponse:
+    """Send method_name to every target with bounded parallelism and collect results."""
+    targets = _select_targets(hass, call)
+    code = call.data.get(ATTR_CODE)
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_COMMANDS)
+
+    async def _run_one(entry_id: str, data: dict[str, Any]) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "config_entry_id": entry_id,
+            "partition": str(data["config"].get(CONF_PARTITION, DEFAULT_PARTITION)).strip(),
+            "success": False,
+            "error": None,
+            "latency_ms": None,
+        }
+
+        user_code = str(data["config"].get(CONF_USER_CODE, ""))
+        if not data["no_pin_required"] and (code is None or str(code) != user_code):
+            result["error"] = "invalid_code"
+            return result
+
+        if method_name != "disarm":
+            force = call.data.get(ATTR_FORCE)
+            if force is None:
+                entry = hass.config_entries.async_get_entry(entry_id)
+                force = entry is not None and entry.options.get(CONF_FORCE_ARM, DEFAULT_FORCE_ARM)
+            blockers = None if force else data["coordinator"].arm_blockers()
+            if blockers is not None:
+                result["error"] = "not_ready"
+                result["open_zones"] = blockers
+                return result
+
+        coordinator = data["coordinator"]
+        # Only the command holds a slot and is timed; the follow-up refresh
+        # runs in the background so it neither blocks other panels nor
+        # inflates latency_ms.
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                await coordinator.async_send_command(method_name, refresh=False)
+                result["success"] = True
+            except Exception as err:
+                _LOGGER.warning("%s failed for entry %s: %s", method_name, entry_id, err)
+                result["error"] = str(err) or type(err).__name__
+            result["latency_ms"] = round((time.monotonic() - start) * 1000)
+
+        if result["success"]:
+            hass.async_create_task(coordinator.async_request_full_refresh())
+        return result
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(_run_one(entry_id, data) for entry_id, data in targets))
+    return {
+        "results": list(results),
+        "elapsed_ms": round((time.monotonic() - start) * 1000),
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_arm(call: ServiceCall) -> ServiceResponse:
+        return await _async_run(hass, call, _ARM_METHODS[call.data[ATTR_MODE]])
+
+    async def _async_disarm(call: ServiceCall) -> ServiceResponse:
+        return await _async_run(hass, call, "disarm")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ARM,
+        _async_arm,
+        schema=ARM_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DISARM,
+        _async_disarm,
+        schema=DISARM_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,220 @@
+"""Zone payload helpers and in-memory zone history for Visonic Alarm."""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+
+# Transitions kept per zone, and the most zones tracked per panel. Together
+# they put a hard cap on history memory (~9 bytes per transition).
+HISTORY_SIZE = 128
+HISTORY_MAX_ZONES = 256
+
+
+# Exact subtype sets seen in your system (plus safe extras)
+OPENING_SUBTYPES = {
+    "CONTACT",
+    "CONTACT_AUX",
+    "MC303_VANISH",
+    "DOOR",
+    "WINDOW",
+    "MAGNET",
+    "REED",
+}
+MOTION_SUBTYPES = {
+    "MOTION",
+    "FLAT_PIR_SMART",
+    "PIR",
+    "PIR_SMART",
+    "CURTAIN_PIR",
+    "MOTION_DETECTOR",
+}
+SMOKE_SUBTYPES = {
+    "SMOKE",
+    "SMOKE_DETECTOR",
+    "FIRE",
+    "HEAT",
+    "CO",
+}
+
+
+def get_field(obj: Any, *keys: str, default=None):
+    if isinstance(obj, dict):
+        for k in keys:
+            if k in obj and obj[k] is not None:
+                return obj[k]
+    for k in keys:
+        if hasattr(obj, k):
+            v = getattr(obj, k)
+            if v is not None:
+                return v
+    return default
+
+
+def device_type(obj: Any) -> str:
+    t = get_field(obj, "device_type", "type", "_Device__device_type", default="")
+    return str(t).strip().upper() if t is not None else ""
+
+
+def zone_id(zone: Any) -> str:
+    return str(get_field(zone, "id", "zone_id", "device_id", "_Device__id", default=""))
+
+
+def device_number(zone: Any) -> str:
+    dn = get_field(zone, "device_number", "_Device__device_number", "number", default=None)
+    return "" if dn is None else str(dn)
+
+
+def zone_name(zone: Any) -> str:
+    name = get_field(zone, "name", "label", "_Device__name", default="")
+    name = str(name).strip() if name is not None else ""
+    zid = zone_id(zone) or "unknown"
+    return name if name else f"Zone {zid}"
+
+
+def zone_subtype(zone: Any) -> str:
+    st = get_field(zone, "subtype", "_Device__subtype", default="")
+    return str(st).strip().upper() if st is not None else ""
+
+
+def truthy(v: Any) -> bool | None:
+    if v is None:
+        return None
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return bool(v)
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in ("1", "true", "on", "open", "opened", "alarm", "triggered", "detected", "fault"):
+            return True
+        if s in ("0", "false", "off", "closed", "clear", "ok", "ready", "normal"):
+            return False
+    return None
+
+
+def parse_warnings(w: Any) -> dict[str, Any]:
+    if w is None:
+        return {}
+    if isinstance(w, dict):
+        return w
+    if isinstance(w, list):
+        out: dict[str, Any] = {}
+        for item in w:
+            if isinstance(item, dict):
+                out.update(item)
+            elif isinstance(item, str):
+                out[item] = True
+        return out
+    if isinstance(w, str):
+        return {w: True}
+    return {"repr": repr(w)}
+
+
+def zone_is_on(zone: Any) -> bool | None:
+    for key in ("open", "is_open", "isOpen", "triggered", "is_triggered", "alarm", "fault"):
+        v = truthy(get_field(zone, key, default=None))
+        if v is not None:
+            return v
+
+    v = truthy(get_field(zone, "state", "status", default=None))
+    if v is not None:
+        return v
+
+    warnings = parse_warnings(get_field(zone, "warnings", "_Device__warnings", default=None))
+    for k in ("open", "opened", "alarm", "triggered", "detected", "fault", "tamper"):
+        if k in warnings:
+            vv = truthy(warnings.get(k))
+            return True if vv is None else vv
+
+    return None
+
+
+def device_class_from_subtype(subtype: str) -> BinarySensorDeviceClass:
+    """
+    STRICT mapping with correct precedence:
+    CONTACT must NEVER end up as SMOKE.
+    """
+    st = (subtype or "").strip().upper()
+
+    # 1) Opening/contact first (your case)
+    if st in OPENING_SUBTYPES:
+        return BinarySensorDeviceClass.OPENING
+    if "CONTACT" in st or "VANISH" in st or "DOOR" in st or "WINDOW" in st:
+        return BinarySensorDeviceClass.OPENING
+
+    # 2) Motion
+    if st in MOTION_SUBTYPES:
+        return BinarySensorDeviceClass.MOTION
+    if "PIR" in st or "MOTION" in st:
+        return BinarySensorDeviceClass.MOTION
+
+    # 3) Smoke/fire
+    if st in SMOKE_SUBTYPES:
+        return BinarySensorDeviceClass.SMOKE
+    if "SMOKE" in st or "FIRE" in st or "HEAT" in st or st == "CO":
+        return BinarySensorDeviceClass.SMOKE
+
+    # Default
+    return BinarySensorDeviceClass.OPENING
+
+
+def zone_key(zone: Any) -> str:
+    """Stable per-zone key; also the tail of the binary sensor unique_id."""
+    zid = zone_id(zone) or "unknown"
+    st = zone_subtype(zone) or "UNKNOWN"
+    dnum = device_number(zone)
+    key = f"{zid}_{st}"
+    if dnum not in ("", "None", "null"):
+        key = f"{key}_{dnum}"
+    return key
+
+
+class ZoneHistory:
+    """Fixed-size ring buffer of on/off transitions for one zone.
+
+    Timestamps and states live in preallocated arrays, so memory per zone is
+    fixed. last_on/last_off are kept as scalars on append; on_count_today
+    scans the buffer back to midnight, so it is bounded by HISTORY_SIZE and
+    counts only transitions still held in the buffer.
+    """
+
+    __slots__ = ("_ts", "_on", "_head", "_size", "last_on", "last_off")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        self._ts = array("d", bytes(8 * size))
+        self._on = array("b", bytes(size))
+        self._head = 0
+        self._size = 0
+        self.last_on: float | None = None
+        self.last_off: float | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, ts: float, is_on: bool) -> None:
+        """Record a transition at UTC timestamp ts."""
+        capacity = len(self._ts)
+        self._ts[self._head] = ts
+        self._on[self._head] = 1 if is_on else 0
+        self._head = (self._head + 1) % capacity
+        self._size = min(self._size + 1, capacity)
+
+        if is_on:
+            self.last_on = ts
+        else:
+            self.last_off = ts
+
+    def on_count_today(self, day_start: float) -> int:
+        """Number of buffered off→on transitions since day_start (local midnight)."""
+        capacity = len(self._ts)
+        count = 0
+        idx = self._head
+        for _ in range(self._size):
+            idx = (idx - 1) % capacity
+            if self._ts[idx] < day_start:
+                break
+            count += self._on[idx]
+        return count